@@ -0,0 +1,103 @@
+import json
+import time
+import argparse
+from sentence_transformers import SentenceTransformer
+from src.encoder import EncodingEngine
+from src.config import embedding_model, encode_batch_size, encode_max_tokens
+from src.scheduler import usable_cpus, plan_resources, apply_inference_threads, make_pool
+from src.budget import LatencyBudget
+from src.persona_analysis import extract_keywords_for_queries
+from main import load_input, process_pdf, get_queries, run_pipeline
+
+def document_paths(input_json):
+    return [d["filename"] for d in load_input(input_json)["documents"]]
+
+def collect_texts(paths):
+    with make_pool(plan_resources()) as pool:
+        sections = sum([sections for sections, _ in pool.map(process_pdf, paths)], [])
+    titles = [s["section_title"] for s in sections]
+    bodies = [s["text"] for s in sections if s["text"].strip()]
+    return titles, bodies
+
+def time_it(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def bench_encoding(model, titles, bodies, batch_size, max_tokens, repeat):
+    texts = titles + bodies
+
+    def legacy():
+        for t in texts:
+            model.encode([t])
+
+    def batched():
+        model.encode(texts, batch_size=batch_size)
+
+    engine = EncodingEngine(model, batch_size=batch_size, max_tokens=max_tokens)
+
+    def engine_encode():
+        engine.encode_passages(titles)
+        engine.encode_sections(bodies)
+
+    results = {}
+    for name, fn in [("per_text_encode", legacy), ("batched_encode", batched), ("encoding_engine", engine_encode)]:
+        fn()
+        elapsed = time_it(fn, repeat)
+        results[name] = {"seconds": round(elapsed, 4), "texts_per_second": round(len(texts) / elapsed, 2)}
+    results["speedup_vs_per_text"] = round(results["per_text_encode"]["seconds"] / results["encoding_engine"]["seconds"], 2)
+    results["speedup_vs_batched"] = round(results["batched_encode"]["seconds"] / results["encoding_engine"]["seconds"], 2)
+    results["num_texts"] = len(texts)
+    results["batch_size"] = engine.batch_size
+    results["max_tokens"] = engine.max_tokens
+    return results
+
+def candidate_counts(cpus):
+    return sorted(set(max(1, round(cpus * f)) for f in (0.25, 0.5, 0.75, 1.0)))
+
+def autotune(model, input_json, batch_size, max_tokens, repeat):
+    """
+    Time the pipeline main.py runs (parse, dedup, rank, analysis) for candidate
+    parse-worker and inference-thread counts. The stages run one after another,
+    so parse workers are swept first with all CPUs for inference, then inference
+    threads with the best worker count. Pool startup is kept out of the timings.
+    """
+    input_data = load_input(input_json)
+    documents = input_data["documents"]
+    queries = get_queries(input_data)
+    keyword_sets = extract_keywords_for_queries(queries)
+    engine = EncodingEngine(model, batch_size=batch_size, max_tokens=max_tokens)
+    cpus = usable_cpus()
+    trials = []
+
+    def trial(parse_workers, inference_threads):
+        plan = plan_resources(parse_workers=parse_workers, inference_threads=inference_threads)
+        apply_inference_threads(plan["inference_threads"])
+        with make_pool(plan) as pool:
+            seconds = time_it(lambda: run_pipeline(documents, queries, keyword_sets, engine, pool, plan["parse_workers"], LatencyBudget()), repeat)
+        trials.append({**plan, "seconds": round(seconds, 4)})
+        return trials[-1]
+
+    best_parse = min((trial(n, cpus) for n in candidate_counts(cpus)), key=lambda t: t["seconds"])
+    best = min([best_parse] + [trial(best_parse["parse_workers"], n) for n in candidate_counts(cpus) if n != cpus], key=lambda t: t["seconds"])
+    return {"cpus": cpus, "best": best, "trials": trials}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input", required=True)
+    parser.add_argument("--batch-size", type=int, default=encode_batch_size)
+    parser.add_argument("--max-tokens", type=int, default=encode_max_tokens)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--autotune", action="store_true", help="pick parse-worker and inference-thread counts for this corpus")
+    args = parser.parse_args()
+    model = SentenceTransformer(embedding_model)
+    if args.autotune:
+        result = autotune(model, args.input, args.batch_size, args.max_tokens, args.repeat)
+        print(json.dumps(result, indent=2))
+        print(f" Recommended: --parse-workers {result['best']['parse_workers']} --inference-threads {result['best']['inference_threads']}")
+    else:
+        titles, bodies = collect_texts(document_paths(args.input))
+        print(json.dumps(bench_encoding(model, titles, bodies, args.batch_size, args.max_tokens, args.repeat), indent=2))
@@ -1,13 +1,19 @@
 import os
 import json
+import math
 import argparse
+import fitz
 from datetime import datetime
-from multiprocessing import Pool
 from sentence_transformers import SentenceTransformer
-from src.pdf_utils import extract_outline_from_pdf, extract_sections_with_text
-from src.persona_analysis import extract_persona_and_task_keywords
-from src.section_ranker import rank_sections, extract_top_subsections
-from src.summarizer import summarize_text
+from src.pdf_utils import scan_pages, extract_outline_from_pdf, extract_sections_with_text
+from src.persona_analysis import extract_keywords_for_queries
+from src.section_ranker import rank_sections_for_queries, assign_positions
+from src.analysis import analyze_sections
+from src.encoder import EncodingEngine
+from src.budget import LatencyBudget
+from src.dedup import deduplicate_sections
+from src.scheduler import plan_resources, apply_inference_threads, make_pool
+from src.config import embedding_model, encode_batch_size, encode_max_tokens, budget_parse_share
 
 def load_input(input_path: str) -> dict:
     with open(input_path, "r", encoding="utf-8") as f:
@@ -17,42 +23,25 @@ def save_output(output_path: str, data: dict):
     with open(output_path, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
 
-def process_pdf(pdf_path):
-    outline_data = extract_outline_from_pdf(pdf_path)
+def process_pdf(pdf_path, scan_seconds=None):
+    with fitz.open(pdf_path) as doc:
+        page_blocks, sampled = scan_pages(doc, time_budget=scan_seconds)
+    outline_data = extract_outline_from_pdf(pdf_path, page_blocks=page_blocks)
     outline = outline_data["outline"]
-    sections = extract_sections_with_text(pdf_path, outline)
-    return sections
+    sections = extract_sections_with_text(pdf_path, outline, page_blocks=page_blocks)
+    return sections, sampled
 
-def main(input_json: str, output_json: str):
-    input_data = load_input(input_json)
-    documents = input_data["documents"]
-    persona = input_data["persona"]
-    job = input_data["job_to_be_done"]
-    keywords = extract_persona_and_task_keywords(persona, job)
-    embedder = SentenceTransformer('intfloat/e5-small')
-    with Pool() as pool:
-        all_sections = sum(pool.map(process_pdf, [d["filename"] for d in documents]), [])
-    top_sections = rank_sections(all_sections, keywords, embedder, top_n=5)
-    subsection_analysis = []
-    for sec in top_sections:
-        subs = extract_top_subsections(sec["text"], keywords, embedder, sec["page_number"], max_subs=50)
-        all_subs = [sub["refined_text"] for sub in subs if sub["refined_text"].strip() and len(sub["refined_text"].split()) >= 10]
-        merged_text = "\n".join(all_subs)
-        if not merged_text or len(merged_text.split()) < 30:
-            merged_text = sec["text"]
-        summary = summarize_text(merged_text, embedder, keywords, num_sentences=3)
-        if not summary or len(summary.split()) < 10:
-            summary = sec["text"]
-        subsection_analysis.append({
-            "document": sec["document"],
-            "refined_text": summary,
-            "page_number": sec["page_number"]
-        })
-    output = {
+def get_queries(input_data: dict) -> list:
+    if "queries" in input_data:
+        return input_data["queries"]
+    return [{"persona": input_data["persona"], "job_to_be_done": input_data["job_to_be_done"]}]
+
+def build_output(documents, query, top_sections, subsection_analysis):
+    return {
         "metadata": {
             "input_documents": [d["filename"] for d in documents],
-            "persona": persona["role"],
-            "job_to_be_done": job["task"],
+            "persona": query["persona"]["role"],
+            "job_to_be_done": query["job_to_be_done"]["task"],
             "processing_timestamp": datetime.utcnow().isoformat() + "Z"
         },
         "extracted_sections": [
@@ -65,12 +54,75 @@ def main(input_json: str, output_json: str):
         ],
         "subsection_analysis": subsection_analysis
     }
-    save_output(output_json, output)
+
+def run_pipeline(documents, queries, keyword_sets, embedder, pool, parse_workers, budget):
+    with budget.stage("parse"):
+        paths = [d["filename"] for d in documents]
+        scan_seconds = None
+        if budget.deadline is not None:
+            scan_seconds = budget.remaining() * budget_parse_share / max(1, math.ceil(len(paths) / parse_workers))
+        parsed = pool.starmap(process_pdf, [(p, scan_seconds) for p in paths])
+        all_sections = sum([sections for sections, _ in parsed], [])
+        if any(sampled for _, sampled in parsed):
+            budget.degrade("sampled_pages")
+    with budget.stage("dedup"):
+        all_sections = deduplicate_sections(assign_positions(all_sections))
+    with budget.stage("rank"):
+        rankings = rank_sections_for_queries(all_sections, keyword_sets, embedder, top_n=5, budget=budget)
+    with budget.stage("analysis"):
+        job_index = {}
+        jobs = []
+        for keywords, top_sections in zip(keyword_sets, rankings):
+            for sec in top_sections:
+                key = (sec["document"], sec["section_title"], sec["page_number"], frozenset(keywords))
+                if key not in job_index:
+                    job_index[key] = len(jobs)
+                    jobs.append((sec, keywords))
+        summaries = analyze_sections(jobs, embedder, pool=pool, max_subs=50, num_sentences=3, budget=budget, workers=parse_workers)
+    analyses = []
+    for keywords, top_sections in zip(keyword_sets, rankings):
+        subsection_analysis = []
+        for sec in top_sections:
+            summary = summaries[job_index[(sec["document"], sec["section_title"], sec["page_number"], frozenset(keywords))]]
+            if not summary or len(summary.split()) < 10:
+                summary = sec["text"]
+            subsection_analysis.append({
+                "document": sec["document"],
+                "refined_text": summary,
+                "page_number": sec["page_number"]
+            })
+        analyses.append(subsection_analysis)
+    return [build_output(documents, query, top, analysis) for query, top, analysis in zip(queries, rankings, analyses)]
+
+def main(input_json: str, output_json: str, batch_size: int = encode_batch_size, max_tokens: int = encode_max_tokens, deadline: float = None, parse_workers: int = None, inference_threads: int = None):
+    budget = LatencyBudget(deadline)
+    plan = plan_resources(parse_workers=parse_workers, inference_threads=inference_threads)
+    apply_inference_threads(plan["inference_threads"])
+    input_data = load_input(input_json)
+    documents = input_data["documents"]
+    queries = get_queries(input_data)
+    with budget.stage("keywords"):
+        keyword_sets = extract_keywords_for_queries(queries)
+    with budget.stage("model_load"):
+        embedder = EncodingEngine(SentenceTransformer(embedding_model), batch_size=batch_size, max_tokens=max_tokens)
+    with make_pool(plan) as pool:
+        outputs = run_pipeline(documents, queries, keyword_sets, embedder, pool, plan["parse_workers"], budget)
+    if deadline is not None:
+        report = budget.report()
+        for output in outputs:
+            output["metadata"]["latency_budget"] = report
+    save_output(output_json, outputs if "queries" in input_data else outputs[0])
     print(f" Output written to {output_json}")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--input", required=True)
     parser.add_argument("--output", required=True)
+    parser.add_argument("--batch-size", type=int, default=encode_batch_size)
+    parser.add_argument("--max-tokens", type=int, default=encode_max_tokens)
+    parser.add_argument("--deadline", type=float, default=None, help="latency budget in seconds; cheaper strategies are used to finish within it")
+    parser.add_argument("--parse-workers", type=int, default=None, help="PDF parse processes (default: all usable CPUs)")
+    parser.add_argument("--inference-threads", type=int, default=None, help="PyTorch intra-op threads (default: all usable CPUs)")
     args = parser.parse_args()
-    main(args.input, args.output)
\ No newline at end of file
+    main(args.input, args.output, batch_size=args.batch_size, max_tokens=args.max_tokens, deadline=args.deadline,
+         parse_workers=args.parse_workers, inference_threads=args.inference_threads)
\ No newline at end of file
@@ -0,0 +1,109 @@
+import time
+import numpy as np
+from src.config import budget_reduced_max_subs
+from src.section_ranker import split_subsections, rank_subsections
+from src.summarizer import split_sentences, leading_sentences, select_summary_sentences, correct_spelling
+
+
+def _merged_subsection_text(section, subs):
+    all_subs = [sub["refined_text"] for sub in subs if sub["refined_text"].strip() and len(sub["refined_text"].split()) >= 10]
+    merged_text = "\n".join(all_subs)
+    if not merged_text or len(merged_text.split()) < 30:
+        merged_text = section["text"]
+    return merged_text
+
+
+def _deadline_passed(budget):
+    return budget is not None and budget.expired()
+
+
+def _lead_summaries(jobs, budget, num_sentences):
+    budget.degrade("lead_sentence_summaries")
+    return [leading_sentences(section["text"], num_sentences=num_sentences) for section, _ in jobs]
+
+
+def _spell_correct_all(summaries, map_fn, budget, workers):
+    if budget is None or budget.deadline is None:
+        return dict(zip(summaries, map_fn(correct_spelling, summaries)))
+    start = time.perf_counter()
+    corrected = {summaries[0]: correct_spelling(summaries[0])}
+    rest = summaries[1:]
+    seconds_per_word = (time.perf_counter() - start) / max(1, len(summaries[0].split()))
+    estimate = seconds_per_word * sum(len(s.split()) for s in rest) / max(1, workers)
+    if rest and budget.allow("skipped_spell_correction", estimate, share=0.8):
+        corrected.update(zip(rest, map_fn(correct_spelling, rest)))
+    return corrected
+
+
+def analyze_sections(jobs, embedder, pool=None, max_subs=50, max_candidates=None, num_sentences=3, spell_correct=True, budget=None, workers=1):
+    """
+    Subsection analysis and summarisation for many (section, keywords) jobs at once.
+    Candidate subsections of every section are encoded in one batched pass, then
+    every summary sentence in a second one; the per-section CPU work (splitting and
+    spell correction) is mapped over `pool` when given, once per distinct section
+    text and distinct summary, so sections shared by several queries are split
+    once. `max_candidates` caps how many candidate subsections per section are
+    encoded at all. When a `budget` is given, costs are estimated from measured
+    rates: candidates are capped at `budget_reduced_max_subs` if encoding them all
+    at the embedder's rate does not fit, and spell correction stops after the
+    first summary if the rest, at that summary's rate over `workers` processes,
+    does not fit. The budget is also re-checked between passes: once its deadline
+    has passed, jobs without a summary yet fall back to their leading sentences
+    and spell correction is skipped. Summaries are returned in job order.
+    """
+    if not jobs:
+        return []
+    if _deadline_passed(budget):
+        return _lead_summaries(jobs, budget, num_sentences)
+    map_fn = pool.map if pool is not None else map
+    unique_texts = list(dict.fromkeys(section["text"] for section, _ in jobs))
+    split_by_text = dict(zip(unique_texts, map_fn(split_subsections, unique_texts)))
+    rate = embedder.seconds_per_word()
+    if budget is not None and rate is not None and (max_candidates is None or max_candidates > budget_reduced_max_subs):
+        candidate_subs = set(sub for section, _ in jobs for sub in split_by_text[section["text"]][:max_candidates])
+        if not budget.allow("reduced_max_subs", rate * sum(len(sub.split()) for sub in candidate_subs), share=0.5):
+            max_candidates = budget_reduced_max_subs
+            max_subs = min(max_subs, budget_reduced_max_subs)
+    candidates = [split_by_text[section["text"]][:max_candidates] for section, _ in jobs]
+
+    keyword_strs = list(dict.fromkeys(" ".join(keywords) for _, keywords in jobs))
+    keyword_embs = dict(zip(keyword_strs, embedder.encode_queries(keyword_strs)))
+    all_subs = list(dict.fromkeys(sub for subs in candidates for sub in subs))
+    sub_embs = dict(zip(all_subs, embedder.encode_passages(all_subs)))
+
+    merged_sentences = []
+    for (section, keywords), subs in zip(jobs, candidates):
+        if not section["text"]:
+            ranked = []
+        elif not subs:
+            ranked = [{"refined_text": section["text"].strip(), "page_number": section["page_number"], "score": 1.0}]
+        else:
+            embs = np.vstack([sub_embs[s] for s in subs])
+            ranked = rank_subsections(list(subs), embs, keyword_embs[" ".join(keywords)], section["page_number"], max_subs=max_subs)
+        merged_text = _merged_subsection_text(section, ranked)
+        merged_sentences.append((merged_text, split_sentences(merged_text)))
+
+    if _deadline_passed(budget):
+        return _lead_summaries(jobs, budget, num_sentences)
+
+    all_sentences = list(dict.fromkeys(s for text, sentences in merged_sentences if len(sentences) > num_sentences for s in sentences))
+    sentence_embs = dict(zip(all_sentences, embedder.encode_passages(all_sentences)))
+
+    summaries = []
+    needs_correction = []
+    for idx, ((_, keywords), (merged_text, sentences)) in enumerate(zip(jobs, merged_sentences)):
+        if not sentences or len(sentences) <= num_sentences:
+            summaries.append(merged_text)
+            continue
+        embs = np.vstack([sentence_embs[s] for s in sentences])
+        summaries.append(select_summary_sentences(sentences, embs, keyword_embs[" ".join(keywords)], num_sentences=num_sentences))
+        needs_correction.append(idx)
+    if spell_correct and needs_correction and _deadline_passed(budget):
+        budget.degrade("skipped_spell_correction")
+        spell_correct = False
+    if spell_correct and needs_correction:
+        unique_summaries = list(dict.fromkeys(summaries[i] for i in needs_correction))
+        corrected = _spell_correct_all(unique_summaries, map_fn, budget, workers)
+        for idx in needs_correction:
+            summaries[idx] = corrected.get(summaries[idx], summaries[idx])
+    return summaries
@@ -0,0 +1,55 @@
+import time
+from contextlib import contextmanager
+
+
+class LatencyBudget:
+    """
+    Tracks wall-clock time against an optional deadline (seconds).
+    Each pipeline stage is timed with `stage()`. Before an expensive step the
+    caller asks `allow()` whether the full-quality estimate fits in its share of
+    the remaining budget; if not, the named degradation is recorded and the
+    caller falls back to a cheaper strategy. With no deadline everything is allowed.
+    """
+
+    def __init__(self, deadline=None):
+        self.deadline = deadline
+        self.start = time.perf_counter()
+        self.stage_timings = {}
+        self.degradations = []
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def remaining(self):
+        if self.deadline is None:
+            return float("inf")
+        return max(0.0, self.deadline - self.elapsed())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_timings[name] = round(time.perf_counter() - start, 4)
+
+    def allow(self, degradation, estimate, share=1.0):
+        if self.deadline is None or estimate <= self.remaining() * share:
+            return True
+        self.degrade(degradation)
+        return False
+
+    def degrade(self, degradation):
+        if degradation not in self.degradations:
+            self.degradations.append(degradation)
+
+    def report(self):
+        return {
+            "deadline_seconds": self.deadline,
+            "elapsed_seconds": round(self.elapsed(), 4),
+            "stage_timings": self.stage_timings,
+            "degradations": self.degradations
+        }
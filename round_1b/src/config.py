@@ -1 +1,16 @@
 
+
+embedding_model = 'intfloat/e5-small'
+encode_batch_size = 32
+encode_max_tokens = 512
+encode_chunk_overlap = 64
+
+budget_parse_share = 0.5
+budget_reduced_max_subs = 10
+
+dedup_num_perm = 64
+dedup_bands = 16
+dedup_threshold = 0.8
+dedup_shingle_size = 3
+
+scheduler_inference_share = 0.5
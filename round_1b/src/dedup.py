@@ -0,0 +1,109 @@
+import re
+import zlib
+import hashlib
+from collections import defaultdict
+import numpy as np
+from src.config import dedup_num_perm, dedup_bands, dedup_threshold, dedup_shingle_size
+
+_mersenne_prime = np.uint64((1 << 61) - 1)
+_max_hash = np.uint64((1 << 32) - 1)
+
+
+def normalize_text(text):
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return " ".join(text.split())
+
+
+def shingles(normalized, size=dedup_shingle_size):
+    words = normalized.split()
+    if len(words) <= size:
+        return {normalized}
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _permutations(num_perm, seed=1):
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+    b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash_signature(shingle_set, a, b):
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingle_set), dtype=np.uint64, count=len(shingle_set))
+    with np.errstate(over="ignore"):
+        permuted = np.bitwise_and((np.outer(a, hashes) + b[:, None]) % _mersenne_prime, _max_hash)
+    return permuted.min(axis=1)
+
+
+class _UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, x):
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, x, y):
+        rx, ry = self.find(x), self.find(y)
+        if rx != ry:
+            self.parent[max(rx, ry)] = min(rx, ry)
+
+
+def deduplicate_sections(sections, num_perm=dedup_num_perm, bands=dedup_bands, threshold=dedup_threshold):
+    """
+    Collapse exact and near-duplicate sections before they are embedded.
+    Exact duplicates share a hash of their normalised text; near-duplicates are
+    found with MinHash signatures bucketed by LSH bands and confirmed by their
+    estimated Jaccard similarity. Each cluster is represented by its first
+    section, which gains a "sources" list of every member's {document,
+    section_title, page_number, text, index, num_sections}; ranking scores the
+    cluster by its best-matching member and reports that member. Positions should
+    be assigned before deduplicating.
+    """
+    if not sections:
+        return []
+    normalized = [normalize_text(s["text"]) for s in sections]
+    uf = _UnionFind(len(sections))
+
+    first_by_hash = {}
+    for i, norm in enumerate(normalized):
+        digest = hashlib.sha1(norm.encode("utf-8")).hexdigest()
+        if digest in first_by_hash:
+            uf.union(first_by_hash[digest], i)
+        else:
+            first_by_hash[digest] = i
+
+    uniques = sorted(first_by_hash.values())
+    rows = num_perm // bands
+    a, b = _permutations(rows * bands)
+    signatures = {i: minhash_signature(shingles(normalized[i]), a, b) for i in uniques if normalized[i]}
+    buckets = defaultdict(list)
+    for i, sig in signatures.items():
+        for band in range(bands):
+            buckets[(band, sig[band * rows:(band + 1) * rows].tobytes())].append(i)
+    for members in buckets.values():
+        for x, i in enumerate(members):
+            for j in members[x + 1:]:
+                if uf.find(i) != uf.find(j) and np.mean(signatures[i] == signatures[j]) >= threshold:
+                    uf.union(i, j)
+
+    clusters = defaultdict(list)
+    for i in range(len(sections)):
+        clusters[uf.find(i)].append(i)
+    deduped = []
+    for root in sorted(clusters):
+        rep = dict(sections[root])
+        rep["sources"] = [
+            {
+                "document": sections[i]["document"],
+                "section_title": sections[i]["section_title"],
+                "page_number": sections[i]["page_number"],
+                "text": sections[i]["text"],
+                "index": sections[i].get("index"),
+                "num_sections": sections[i].get("num_sections")
+            } for i in clusters[root]
+        ]
+        deduped.append(rep)
+    return deduped
@@ -0,0 +1,114 @@
+import re
+import time
+import numpy as np
+from src.config import encode_batch_size, encode_max_tokens, encode_chunk_overlap
+
+QUERY_PREFIX = "query: "
+PASSAGE_PREFIX = "passage: "
+
+
+class EncodingEngine:
+    """
+    Single entry point for every embedding call in the pipeline.
+    Wraps a SentenceTransformer and:
+      - applies the e5 "query: " / "passage: " prefixes consistently
+      - sends every call's texts to the model as one list, so its length-sorted
+        batching keeps padding low
+      - splits passages longer than max_tokens into overlapping windows and
+        mean-pools the window vectors into one section vector
+    max_tokens is applied only for the engine's own encode calls; the shared model's
+    max_seq_length is restored afterwards. All returned vectors are L2-normalised,
+    so cosine similarity is a dot product. Calls of at least one full batch are
+    timed, so `seconds_per_word()` gives the measured encode rate for budgeting.
+    """
+
+    def __init__(self, model, batch_size=encode_batch_size, max_tokens=encode_max_tokens, chunk_overlap=encode_chunk_overlap):
+        self.model = model
+        self.batch_size = max(1, int(batch_size))
+        model_limit = getattr(model, "max_seq_length", None) or max_tokens
+        self.max_tokens = max(16, min(int(max_tokens), model_limit))
+        self.chunk_overlap = max(0, min(int(chunk_overlap), self.max_tokens // 2))
+        self.tokenizer = getattr(model, "tokenizer", None)
+        self.timed_words = 0
+        self.timed_seconds = 0.0
+
+    @property
+    def dim(self):
+        return self.model.get_sentence_embedding_dimension()
+
+    def seconds_per_word(self):
+        if not self.timed_words:
+            return None
+        return self.timed_seconds / self.timed_words
+
+    def _token_lengths(self, texts):
+        if self.tokenizer is None:
+            return [len(t.split()) for t in texts]
+        ids = self.tokenizer(list(texts), add_special_tokens=False, truncation=False)["input_ids"]
+        return [len(i) for i in ids]
+
+    def _token_spans(self, text):
+        if self.tokenizer is not None and getattr(self.tokenizer, "is_fast", False):
+            enc = self.tokenizer(text, add_special_tokens=False, truncation=False, return_offsets_mapping=True)
+            return enc["offset_mapping"]
+        return [m.span() for m in re.finditer(r"\S+", text)]
+
+    def _encode(self, texts):
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        model_limit = getattr(self.model, "max_seq_length", None)
+        if model_limit is not None:
+            self.model.max_seq_length = self.max_tokens
+        start = time.perf_counter()
+        try:
+            embs = self.model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True, normalize_embeddings=True, show_progress_bar=False)
+        finally:
+            if model_limit is not None:
+                self.model.max_seq_length = model_limit
+        if len(texts) >= self.batch_size:
+            self.timed_words += sum(len(t.split()) for t in texts)
+            self.timed_seconds += time.perf_counter() - start
+        return np.asarray(embs, dtype=np.float32)
+
+    def encode_queries(self, texts):
+        return self._encode([QUERY_PREFIX + t for t in texts])
+
+    def encode_passages(self, texts):
+        return self._encode([PASSAGE_PREFIX + t for t in texts])
+
+    def _prefix_tokens(self):
+        if not hasattr(self, "_prefix_len"):
+            self._prefix_len = self._token_lengths([PASSAGE_PREFIX.strip()])[0]
+        return self._prefix_len
+
+    def chunk_passage(self, text):
+        budget = self.max_tokens - self._prefix_tokens() - 2
+        spans = self._token_spans(text)
+        if len(spans) <= budget:
+            return [text]
+        stride = max(1, budget - self.chunk_overlap)
+        chunks = []
+        for start in range(0, len(spans), stride):
+            window = spans[start:start + budget]
+            chunks.append(text[window[0][0]:window[-1][1]])
+            if start + budget >= len(spans):
+                break
+        return chunks
+
+    def encode_sections(self, texts):
+        """
+        Encode section bodies of any length. Over-length passages are chunked
+        into token windows; the window vectors are mean-pooled and re-normalised.
+        """
+        chunks = []
+        owners = []
+        for idx, text in enumerate(texts):
+            for chunk in self.chunk_passage(text):
+                chunks.append(chunk)
+                owners.append(idx)
+        chunk_embs = self.encode_passages(chunks)
+        pooled = np.zeros((len(texts), chunk_embs.shape[1] if len(chunk_embs) else self.dim), dtype=np.float32)
+        np.add.at(pooled, np.asarray(owners, dtype=np.int64), chunk_embs)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return pooled / norms
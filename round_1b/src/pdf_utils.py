@@ -1,6 +1,7 @@
 import os
 import json
 import re
+import time
 from pathlib import Path
 import fitz
 from collections import Counter, defaultdict
@@ -200,15 +201,40 @@ def get_dbscan_heading_sizes(font_sizes):
 def get_histogram_heading_sizes(font_sizes, body_size):
     return set([fs for fs in font_sizes if fs > body_size + 0.5])
 
-def extract_outline_from_pdf(pdf_path):
+def scan_pages(doc, time_budget=None):
+    """
+    Read the "dict" layout of every page, in order. When `time_budget` (seconds)
+    is given and the measured per-page rate says the rest of the document will not
+    fit, only an evenly spaced subset of the remaining pages that does fit is read.
+    Returns ({page_number: blocks}, sampled).
+    """
+    page_blocks = {}
+    pending = list(range(1, doc.page_count + 1))
+    sampled = False
+    start = time.perf_counter()
+    while pending:
+        page_num = pending.pop(0)
+        page_blocks[page_num] = doc[page_num - 1].get_text("dict")["blocks"]
+        if time_budget is None or sampled or not pending:
+            continue
+        elapsed = time.perf_counter() - start
+        per_page = elapsed / len(page_blocks)
+        if elapsed + per_page * len(pending) > time_budget:
+            fit = min(len(pending), int(max(0.0, time_budget - elapsed) / per_page))
+            pending = [pending[int(i)] for i in np.linspace(0, len(pending) - 1, fit).round()] if fit else []
+            sampled = True
+    return page_blocks, sampled
+
+def extract_outline_from_pdf(pdf_path, page_blocks=None):
     doc = fitz.open(pdf_path)
+    if page_blocks is None:
+        page_blocks, _ = scan_pages(doc)
     title, title_lines = extract_title_and_title_lines(doc)
     headings = []
     font_sizes = []
     line_info = []
     seen_headings = set()
-    for page_num, page in enumerate(doc, start=1):
-        blocks = page.get_text("dict")["blocks"]
+    for page_num, blocks in sorted(page_blocks.items()):
         for b in blocks:
             for line in b.get("lines", []):
                 line_text = " ".join([span["text"].strip() for span in line.get("spans", []) if span["text"].strip()])
@@ -239,7 +265,7 @@ def extract_outline_from_pdf(pdf_path):
             size_to_level[fs] = f'H{idx+1}'
     dbscan_headings = get_dbscan_heading_sizes(font_sizes)
     hist_headings = get_histogram_heading_sizes(font_sizes, body_size)
-    repeated_lines = find_repeated_lines(line_info, len(doc))
+    repeated_lines = find_repeated_lines(line_info, len(page_blocks))
     raw_headings = []
     for line in line_info:
         text = clean_heading(line["text"])
@@ -368,11 +394,13 @@ def is_true_heading(text, size, is_bold, min_size, max_size):
         return False
     return True
 
-def extract_sections_with_text(pdf_path, outline):
+def extract_sections_with_text(pdf_path, outline, page_blocks=None):
     """
     Given a PDF path and its outline (list of headings with page numbers),
     extract the full text for each section (from heading to next heading or end of doc).
     Only use real detected headings as section titles.
+    `page_blocks` from scan_pages() is reused instead of re-reading pages; pages it
+    does not contain (skipped by a sampled scan) contribute no text.
     Returns a list of dicts: {document, section_title, page_number, text}
     """
     import fitz
@@ -380,6 +408,8 @@ def extract_sections_with_text(pdf_path, outline):
     sections = []
     if not outline:
         return sections
+    if page_blocks is None:
+        page_blocks, _ = scan_pages(doc)
 
     font_sizes = [h.get("size") for h in outline if h.get("size")]
     if font_sizes:
@@ -399,8 +429,7 @@ def extract_sections_with_text(pdf_path, outline):
         page_num = h["page"] - 1
         heading_text = h["text"].strip()
         y0 = None
-        page = doc[page_num]
-        blocks = page.get_text("dict")["blocks"]
+        blocks = page_blocks.get(page_num + 1, [])
         for b in blocks:
             for line in b.get("lines", []):
                 line_text = " ".join([span["text"].strip() for span in line.get("spans", []) if span["text"].strip()])
@@ -418,8 +447,7 @@ def extract_sections_with_text(pdf_path, outline):
         end = heading_locs[i+1] if i+1 < len(heading_locs) else None
         texts = []
         for p in range(start["page"], doc.page_count if end is None else end["page"]+1):
-            page = doc[p]
-            blocks = page.get_text("dict")["blocks"]
+            blocks = page_blocks.get(p + 1, [])
             for b in blocks:
                 for line in b.get("lines", []):
                     y0 = min([span.get("bbox", [0, 0, 0, 0])[1] for span in line.get("spans", [])])
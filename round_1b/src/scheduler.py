@@ -0,0 +1,119 @@
+import os
+import math
+from multiprocessing import Pool
+from threadpoolctl import threadpool_limits
+from src.config import scheduler_inference_share
+
+
+def _read(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _cgroup_paths():
+    v2_path = v1_path = None
+    for line in (_read("/proc/self/cgroup") or "").splitlines():
+        hierarchy, controllers, path = line.split(":", 2)
+        if hierarchy == "0" and not controllers:
+            v2_path = path
+        elif "cpu" in controllers.split(","):
+            v1_path = path
+    return v2_path, v1_path
+
+
+def _ancestors(path):
+    parts = [p for p in path.split("/") if p]
+    for i in range(len(parts), -1, -1):
+        yield "/".join(parts[:i])
+
+
+def _quota_cpus(quota, period):
+    quota, period = int(quota), int(period)
+    if quota > 0 and period > 0:
+        return max(1, math.ceil(quota / period))
+    return None
+
+
+def cgroup_cpu_limit():
+    """
+    Tightest CPU quota imposed on this process by its cgroups, rounded up to whole
+    CPUs, or None when unlimited. The process's cgroup is resolved from
+    /proc/self/cgroup and every ancestor is checked, under cgroup v2 (cpu.max) and
+    v1 (cpu.cfs_quota_us / cpu.cfs_period_us), since either may carry the limit.
+    """
+    v2_path, v1_path = _cgroup_paths()
+    limits = []
+    for path in _ancestors(v2_path or ""):
+        cpu_max = _read(os.path.join("/sys/fs/cgroup", path, "cpu.max"))
+        if cpu_max:
+            quota, _, period = cpu_max.partition(" ")
+            if quota != "max" and period:
+                limits.append(_quota_cpus(quota, period))
+    for base in ("/sys/fs/cgroup/cpu", "/sys/fs/cgroup/cpu,cpuacct"):
+        for path in _ancestors(v1_path or ""):
+            quota = _read(os.path.join(base, path, "cpu.cfs_quota_us"))
+            period = _read(os.path.join(base, path, "cpu.cfs_period_us"))
+            if quota and period:
+                limits.append(_quota_cpus(quota, period))
+    limits = [limit for limit in limits if limit]
+    return min(limits) if limits else None
+
+
+def usable_cpus():
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    limit = cgroup_cpu_limit()
+    return min(cpus, limit) if limit else cpus
+
+
+def plan_resources(parse_workers=None, inference_threads=None, overlapped=False, inference_share=scheduler_inference_share):
+    """
+    Decide how many PDF parse workers and PyTorch inference threads to use.
+    When parsing and inference run one after the other (as in main.py) each
+    step gets every usable CPU. When they overlap, `inference_share` of the CPUs
+    go to inference and the rest to parsing so the machine is not oversubscribed.
+    Explicit counts always win.
+    """
+    cpus = usable_cpus()
+    if not overlapped:
+        parse_workers = cpus if parse_workers is None else parse_workers
+        inference_threads = cpus if inference_threads is None else inference_threads
+    elif inference_threads is None:
+        if parse_workers is not None:
+            inference_threads = cpus - parse_workers
+        else:
+            inference_threads = round(cpus * inference_share)
+    inference_threads = max(1, min(int(inference_threads), cpus))
+    if parse_workers is None:
+        parse_workers = cpus - inference_threads
+    parse_workers = max(1, int(parse_workers))
+    return {"cpus": cpus, "parse_workers": parse_workers, "inference_threads": inference_threads}
+
+
+def limit_worker_threads():
+    threadpool_limits(1)
+    try:
+        import torch
+        torch.set_num_threads(1)
+    except ImportError:
+        pass
+
+
+def apply_inference_threads(num_threads):
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(num_threads)
+    threadpool_limits(num_threads)
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+    except ImportError:
+        pass
+
+
+def make_pool(plan):
+    return Pool(processes=plan["parse_workers"], initializer=limit_worker_threads)
@@ -1,57 +1,106 @@
 import re
-from typing import List, Dict, Any, Set
+from typing import List, Dict, Any, Tuple
 import numpy as np
 from collections import defaultdict
 
-def cosine_sim(a, b):
-    return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
-
-def rank_sections(sections, keywords, embedder, top_n=5):
-    if not sections or not keywords:
-        return []
-    persona_job = " ".join(keywords)
-    query_emb = embedder.encode([persona_job])[0]
-    doc_scores = []
+def assign_positions(sections):
     doc_sections = defaultdict(list)
     for s in sections:
         doc_sections[s['document']].append(s)
-    for doc, secs in doc_sections.items():
+    for secs in doc_sections.values():
         for idx, s in enumerate(secs):
             s['index'] = idx
             s['num_sections'] = len(secs)
-            title = s['section_title']
-            text = s['text']
-            title_emb = embedder.encode([title])[0]
-            text_emb = embedder.encode([text])[0] if text.strip() else title_emb
-            sim_score = 0.6 * cosine_sim(query_emb, title_emb) + 0.4 * cosine_sim(query_emb, text_emb)
-            position_score = 1 - (s['index'] / s['num_sections'])
-            final_score = sim_score + 0.1 * position_score
-            doc_scores.append((s, final_score))
-    ranked = sorted(doc_scores, key=lambda x: -x[1])
+    return sections
+
+def _member_view(section, member):
+    if member is None:
+        return section
+    return {**section, **{k: member[k] for k in ('document', 'section_title', 'page_number', 'text', 'index', 'num_sections') if member.get(k) is not None}}
+
+def _select_diverse(sections, scores, members, top_n):
+    order = np.argsort(-scores, kind="stable")
     selected = []
+    picked = set()
     used_docs = set()
-    for section, score in ranked:
-        doc = section['document']
-        if doc not in used_docs and len(section.get('text', '').split()) >= 30:
-            section['importance_score'] = float(score)
-            section['importance_rank'] = len(selected) + 1
-            selected.append(section)
-            used_docs.add(doc)
+
+    def pick(i, view):
+        selected.append({**view, 'importance_score': float(scores[i]), 'importance_rank': len(selected) + 1})
+        picked.add(i)
+
+    for i in order:
+        view = _member_view(sections[i], members[i])
+        if view['document'] not in used_docs and len(view.get('text', '').split()) >= 30:
+            pick(i, view)
+            used_docs.add(view['document'])
         if len(selected) == top_n:
             break
     if len(selected) < top_n:
-        for section, score in ranked:
-            if section not in selected and len(section.get('text', '').split()) >= 30:
-                section['importance_score'] = float(score)
-                section['importance_rank'] = len(selected) + 1
-                selected.append(section)
+        for i in order:
+            view = _member_view(sections[i], members[i])
+            if i not in picked and len(view.get('text', '').split()) >= 30:
+                pick(i, view)
             if len(selected) == top_n:
                 break
     return selected
 
-def extract_top_subsections(section_text: str, keywords: Set[str], embedder, page: int, max_subs: int = 5) -> List[Dict[str, Any]]:
-    if not section_text:
-        return []
+def rank_sections_for_queries(sections, keyword_sets, embedder, top_n=5, title_only=False, budget=None):
+    """
+    Rank one parsed corpus against many persona/job keyword sets at once.
+    Sections are embedded a single time and all queries are scored against the
+    section matrices with matrix multiplies. A deduplicated section carrying
+    "sources" is scored by its best-matching member title and that member's
+    position, and is reported with that member's document, title, page and text.
+    When a `budget` is given, section bodies are only encoded if their cost at the
+    rate measured while encoding the titles fits it; otherwise ranking uses titles
+    only. Returns one ranked list per query; the selected entries are copies, so
+    queries never overwrite each other's scores.
+    """
+    if not sections:
+        return [[] for _ in keyword_sets]
+    if any('index' not in s for s in sections):
+        assign_positions(sections)
+    doc_sections = defaultdict(list)
+    for s in sections:
+        doc_sections[s['document']].append(s)
+    ordered = [s for secs in doc_sections.values() for s in secs]
+    active = [q for q, keywords in enumerate(keyword_sets) if keywords]
+    results = [[] for _ in keyword_sets]
+    if not active:
+        return results
+    query_embs = embedder.encode_queries([" ".join(keyword_sets[q]) for q in active])
+    member_titles = [[m['section_title'] for m in s.get('sources', [])] or [s['section_title']] for s in ordered]
+    titles = list(dict.fromkeys([s['section_title'] for s in ordered] + [t for ts in member_titles for t in ts]))
+    title_pos = {t: i for i, t in enumerate(titles)}
+    title_embs = embedder.encode_passages(titles)
+    text_embs = title_embs[[title_pos[s['section_title']] for s in ordered]]
+    with_text = [] if title_only else [i for i, s in enumerate(ordered) if s['text'].strip()]
+    rate = embedder.seconds_per_word()
+    if with_text and budget is not None and rate is not None:
+        estimate = rate * sum(len(ordered[i]['text'].split()) for i in with_text)
+        if not budget.allow("title_only_ranking", estimate, share=0.5):
+            with_text = []
+    if with_text:
+        text_embs[with_text] = embedder.encode_sections([ordered[i]['text'] for i in with_text])
+    title_scores_all = query_embs @ title_embs.T
+    title_scores = np.zeros((len(active), len(ordered)))
+    best_member = np.zeros((len(active), len(ordered)), dtype=np.int64)
+    for i, ts in enumerate(member_titles):
+        member_scores = title_scores_all[:, [title_pos[t] for t in ts]]
+        best_member[:, i] = member_scores.argmax(axis=1)
+        title_scores[:, i] = member_scores.max(axis=1)
+    position_scores = np.zeros((len(active), len(ordered)))
+    for i, s in enumerate(ordered):
+        members = s.get('sources') or [s]
+        member_positions = np.array([1 - ((m.get('index') if m.get('index') is not None else s['index']) / (m.get('num_sections') or s['num_sections'])) for m in members])
+        position_scores[:, i] = member_positions[best_member[:, i]]
+    final_scores = 0.6 * title_scores + 0.4 * (query_embs @ text_embs.T) + 0.1 * position_scores
+    for row, q in enumerate(active):
+        members = [s['sources'][best_member[row, i]] if s.get('sources') else None for i, s in enumerate(ordered)]
+        results[q] = _select_diverse(ordered, final_scores[row], members, top_n)
+    return results
+
+def split_subsections(section_text: str) -> Tuple[str, ...]:
     bullet_pattern = re.compile(r"^\s*([•\-\*\d+\.]|\(\w+\)|[\[\(]\d+[\]\)])+\s+")
     lines = section_text.splitlines()
     subs = []
@@ -71,17 +120,17 @@ def extract_top_subsections(section_text: str, keywords: Set[str], embedder, pag
     if list_like:
         subs = list_like + [s for s in subs if s not in list_like]
     seen = set()
-    unique_subs = [s for s in subs if s not in seen and not seen.add(s) and len(s.split()) >= 5]
-    if not unique_subs:
-        return [{"refined_text": section_text.strip(), "page_number": page, "score": 1.0}]
-    keyword_str = " ".join(keywords)
-    kw_emb = embedder.encode([keyword_str])[0]
+    return tuple(s for s in subs if s not in seen and not seen.add(s) and len(s.split()) >= 5)
+
+def rank_subsections(unique_subs, sub_embs, kw_emb, page: int, max_subs: int = 5) -> List[Dict[str, Any]]:
+    scores = sub_embs @ kw_emb
     scored = []
-    for s in unique_subs:
-        s_emb = embedder.encode([s])[0]
-        score = cosine_sim(s_emb, kw_emb)
-        if not any(cosine_sim(s_emb, embedder.encode([other])[0]) > 0.95 for other, _ in scored):
-            scored.append((s, score))
+    kept = []
+    for i, s in enumerate(unique_subs):
+        if kept and np.max(sub_embs[kept] @ sub_embs[i]) > 0.95:
+            continue
+        kept.append(i)
+        scored.append((s, scores[i]))
     ranked = sorted(scored, key=lambda x: -x[1])
     result = []
     for sub, score in ranked[:max_subs]:
@@ -90,4 +139,4 @@ def extract_top_subsections(section_text: str, keywords: Set[str], embedder, pag
             "page_number": page,
             "score": float(score)
         })
-    return result
\ No newline at end of file
+    return result